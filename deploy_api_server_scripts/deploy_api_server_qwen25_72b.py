@@ -6,7 +6,9 @@ This server handles external requests to interact with the language model.
 
 import os
 import sys
+import asyncio
 import logging
+from collections import deque
 from pathlib import Path
 
 # Add project root to sys.path for importing from src
@@ -32,6 +34,21 @@ app = FastAPI(title="Qwen2.5-72B-Instruct API Server")
 # Model instance
 model = None
 
+# Micro-batching: queries arriving within BATCH_WINDOW_MS are coalesced, up to BATCH_MAX at a time
+BATCH_MAX = int(os.environ.get("BATCH_MAX", 16))
+BATCH_WINDOW_MS = int(os.environ.get("BATCH_WINDOW_MS", 5))
+
+# Length binning: prompts are grouped into BATCH_BINS bins of BATCH_BIN_WIDTH characters
+# so a batch pads as little as possible; a bin whose oldest query has waited
+# BATCH_MAX_WAIT_MS is dispatched first so short bins are not starved
+BATCH_BINS = int(os.environ.get("BATCH_BINS", 4))
+BATCH_BIN_WIDTH = int(os.environ.get("BATCH_BIN_WIDTH", 512))
+BATCH_MAX_WAIT_MS = int(os.environ.get("BATCH_MAX_WAIT_MS", 100))
+
+# Queue of (QueryRequest, Future, arrival time) tuples consumed by the batch worker
+query_queue = None
+batch_task = None
+
 class QueryRequest(BaseModel):
     """Request schema for query endpoint"""
     prompt: str
@@ -52,6 +69,110 @@ async def startup_event():
         logger.error(f"Failed to initialize model: {str(e)}")
         # We'll continue running so the health endpoint still works,
         # but query endpoint will return errors
+    
+    global query_queue, batch_task
+    query_queue = asyncio.Queue()
+    batch_task = asyncio.create_task(batch_worker())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the batch worker"""
+    if batch_task is not None:
+        batch_task.cancel()
+
+def add_to_bin(bins, item):
+    """
+    Add a queued query to the bin for its prompt length.
+    
+    Args:
+        bins (list of deque): The length bins
+        item (tuple): (QueryRequest, Future, arrival time) as queued by process_query
+    """
+    request = item[0]
+    index = min(len(request.prompt) // BATCH_BIN_WIDTH, BATCH_BINS - 1)
+    bins[index].append(item)
+
+def select_bin(bins, now):
+    """
+    Choose the bin to dispatch: one whose oldest query has waited too long
+    since it arrived, including time spent in query_queue, otherwise the one
+    with the most waiting queries.
+    
+    Args:
+        bins (list of deque): The length bins
+        now (float): Current event loop time
+        
+    Returns:
+        deque: The bin to dispatch from
+    """
+    overdue = [b for b in bins if b and now - b[0][2] >= BATCH_MAX_WAIT_MS / 1000]
+    if overdue:
+        return min(overdue, key=lambda b: b[0][2])
+    return max(bins, key=len)
+
+async def batch_worker():
+    """Collect queued queries into length bins and run them batch by batch"""
+    loop = asyncio.get_running_loop()
+    bins = [deque() for _ in range(BATCH_BINS)]
+    while True:
+        if not any(bins):
+            # Idle: wait for a query, then give others a short window to join it
+            add_to_bin(bins, await query_queue.get())
+            deadline = loop.time() + BATCH_WINDOW_MS / 1000
+            while max(len(b) for b in bins) < BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(query_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                add_to_bin(bins, item)
+        
+        # Pick up everything that arrived while the previous batch was running
+        while not query_queue.empty():
+            add_to_bin(bins, query_queue.get_nowait())
+        
+        selected = select_bin(bins, loop.time())
+        batch = []
+        while selected and len(batch) < BATCH_MAX:
+            request, future, _ = selected.popleft()
+            batch.append((request, future))
+        
+        await run_batch(batch)
+
+async def run_batch(batch):
+    """
+    Run a batch of queries and resolve their futures.
+    Queries are grouped by generation parameters, since one generate_batch
+    call shares them across all of its prompts.
+    
+    Args:
+        batch (list): (QueryRequest, Future) pairs
+    """
+    groups = {}
+    for request, future in batch:
+        params = (request.max_tokens, request.temperature, request.top_p)
+        groups.setdefault(params, []).append((request, future))
+    
+    loop = asyncio.get_running_loop()
+    for (max_tokens, temperature, top_p), items in groups.items():
+        prompts = [request.prompt for request, _ in items]
+        logger.info(f"Processing batch of {len(prompts)} queries")
+        try:
+            # Run in a worker thread so the event loop keeps accepting requests
+            responses = await loop.run_in_executor(
+                None, model.generate_batch, prompts, max_tokens, temperature, top_p
+            )
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, future), response in zip(items, responses):
+            if not future.done():
+                future.set_result(response)
 
 @app.get("/health")
 async def health_check():
@@ -69,12 +190,11 @@ async def process_query(request: QueryRequest):
     
     try:
         logger.info(f"Processing query with {len(request.prompt)} characters")
-        response = model.generate(
-            prompt=request.prompt,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature,
-            top_p=request.top_p
-        )
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # The arrival time lets the batch worker count time spent queued toward BATCH_MAX_WAIT_MS
+        await query_queue.put((request, future, loop.time()))
+        response = await future
         return {"response": response}
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}")
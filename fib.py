@@ -3,66 +3,198 @@
 Efficient Fibonacci number calculator using memoization (dynamic programming).
 """
 
+import atexit
+import functools
+import os
+import shelve
 import sys
+import threading
 
-def fibonacci_memo(n, memo={}):
+# Memo shared by all fibonacci_memo callers: _MEMO[i] == F(i)
+_MEMO = [0, 1]
+_MEMO_MAX = 4096
+_MEMO_LOCK = threading.Lock()
+
+# On-disk cache for persistent_cache; small n is cheaper to recompute than to look up.
+# The dbm backend may be dbm.dumb, which neither locks against other processes nor
+# reclaims space, so the cache is bounded by what it accepts: at most
+# _CACHE_MAX_ENTRIES results for n <= _CACHE_MAX_N (about 85 KB each at the top),
+# after which new results are computed but no longer stored
+_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "fib", "shelve.db")
+_CACHE_MIN_N = 1000
+_CACHE_MAX_N = 10**6
+_CACHE_MAX_ENTRIES = 256
+_cache_db = None
+_cache_lock = threading.Lock()
+
+def _open_cache():
+    """Open the shelve database on first use and close it at exit."""
+    global _cache_db
+    if _cache_db is None:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        _cache_db = shelve.open(_CACHE_PATH)
+        atexit.register(_cache_db.close)
+    return _cache_db
+
+def persistent_cache(func):
+    """
+    Cache the results of a deterministic func(n) on disk so they survive restarts.
+    Falls back to plain computation if the cache cannot be opened, read or
+    written; an entry that cannot be read is removed and recomputed.
+    """
+    @functools.wraps(func)
+    def wrapper(n):
+        if not _CACHE_MIN_N <= n <= _CACHE_MAX_N:
+            return func(n)
+
+        key = f"{func.__name__}:{n}"
+        try:
+            with _cache_lock:
+                db = _open_cache()
+        except Exception:
+            return func(n)
+
+        with _cache_lock:
+            try:
+                return db[key]
+            except KeyError:
+                pass
+            except Exception:
+                # Damaged entry, e.g. a truncated pickle; drop it and recompute
+                try:
+                    del db[key]
+                except Exception:
+                    pass
+
+        result = func(n)
+        try:
+            with _cache_lock:
+                if len(db) < _CACHE_MAX_ENTRIES:
+                    db[key] = result
+        except Exception:
+            pass  # The result is still valid, it just is not persisted
+        return result
+    return wrapper
+
+def fibonacci_memo(n):
     """
     Calculate the nth Fibonacci number using memoization.
+    The shared memo is filled bottom-up from the highest cached index, so there
+    is no recursion and repeat calls reuse earlier work. Only the first
+    _MEMO_MAX values are kept, which bounds memory for very large n.
     This approach has O(n) time complexity.
     """
-    if n in memo:
-        return memo[n]
     if n <= 1:
         return n
-    
-    memo[n] = fibonacci_memo(n-1, memo) + fibonacci_memo(n-2, memo)
-    return memo[n]
 
-def fibonacci_iterative(n):
+    # The lock is only held while the memo grows, which is bounded by _MEMO_MAX
+    with _MEMO_LOCK:
+        m = len(_MEMO)
+        if n < m:
+            return _MEMO[n]
+
+        a, b = _MEMO[m - 2], _MEMO[m - 1]
+        for _ in range(m, min(n, _MEMO_MAX - 1) + 1):
+            a, b = b, a + b
+            _MEMO.append(b)
+        if n < _MEMO_MAX:
+            return b
+
+    # Past the end of the memo, continue from its last two values without the lock
+    for _ in range(_MEMO_MAX, n + 1):
+        a, b = b, a + b
+    return b
+
+# Largest n whose Fibonacci number fits in a signed 64-bit integer
+_FIB_INT64_MAX_N = 92
+
+_fib_int64 = None
+
+def _get_fib_int64():
+    """
+    Import Numba and compile the native-integer loop on first use.
+    Returns None when Numba is not installed.
+    """
+    global _fib_int64
+    if _fib_int64 is None:
+        try:
+            from numba import njit
+        except ImportError:  # Numba is optional; without it the pure Python loop is used
+            return None
+
+        @njit(cache=True)
+        def fib_int64(n):
+            """Native-integer Fibonacci loop, valid for n <= _FIB_INT64_MAX_N"""
+            a, b = 0, 1
+            for _ in range(n - 1):
+                a, b = b, a + b
+            return b
+
+        _fib_int64 = fib_int64
+    return _fib_int64
+
+def fibonacci_iterative(n, native=False):
     """
     Calculate the nth Fibonacci number using an iterative approach.
+    With native=True, Numba is installed and the result fits in 64 bits, the
+    loop runs as compiled native code. Importing Numba and loading or compiling
+    the loop costs far more than a single call saves, so this is opt-in and
+    only worthwhile for many calls in one process.
     This approach has O(n) time complexity and O(1) space complexity.
     """
     if n <= 1:
         return n
+    if native and n <= _FIB_INT64_MAX_N:
+        fib_int64 = _get_fib_int64()
+        if fib_int64 is not None:
+            return int(fib_int64(n))
     
     a, b = 0, 1
     for _ in range(2, n+1):
         a, b = b, a + b
     return b
 
+@persistent_cache
 def fibonacci_matrix(n):
     """
-    Calculate the nth Fibonacci number using matrix exponentiation.
+    Calculate the nth Fibonacci number using fast doubling, the reduced form of
+    matrix exponentiation:
+        F(2k)   = F(k) * (2*F(k+1) - F(k))
+        F(2k+1) = F(k)^2 + F(k+1)^2
     This approach has O(log n) time complexity.
     """
-    def matrix_multiply(A, B):
-        a = A[0][0] * B[0][0] + A[0][1] * B[1][0]
-        b = A[0][0] * B[0][1] + A[0][1] * B[1][1]
-        c = A[1][0] * B[0][0] + A[1][1] * B[1][0]
-        d = A[1][0] * B[0][1] + A[1][1] * B[1][1]
-        return [[a, b], [c, d]]
-    
-    def matrix_power(A, n):
-        if n == 1:
-            return A
-        if n % 2 == 0:
-            return matrix_power(matrix_multiply(A, A), n // 2)
+    a, b = 0, 1  # F(k), F(k+1), starting from k = 0
+    for bit in bin(n)[2:]:
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
         else:
-            return matrix_multiply(A, matrix_power(matrix_multiply(A, A), (n - 1) // 2))
-    
-    if n == 0:
-        return 0
-    
-    return matrix_power([[1, 1], [1, 0]], n)[0][1]
+            a, b = c, d
+    return a
+
+def fibonacci(n):
+    """
+    Calculate the nth Fibonacci number with the fastest method.
+    Fast doubling is O(log n) and beats the pure Python O(n) loop for every n.
+    """
+    if n <= 1:
+        return n
+    return fibonacci_matrix(n)
 
 if __name__ == "__main__":
+    # --all compares every method; by default only the fastest one runs
+    args = sys.argv[1:]
+    run_all = "--all" in args
+    if run_all:
+        args.remove("--all")
+    
     # Check if a command line argument is provided
-    if len(sys.argv) > 1:
+    if args:
         try:
-            n = int(sys.argv[1])
+            n = int(args[0])
         except ValueError:
-            print(f"Error: '{sys.argv[1]}' is not a valid integer")
+            print(f"Error: '{args[0]}' is not a valid integer")
             sys.exit(1)
     else:
         # If no argument provided, prompt the user
@@ -72,6 +204,13 @@ if __name__ == "__main__":
             print("Error: Invalid input. Please enter an integer.")
             sys.exit(1)
     
-    print(f"Fibonacci({n}) using memoization = {fibonacci_memo(n)}")
-    print(f"Fibonacci({n}) using iteration = {fibonacci_iterative(n)}")
-    print(f"Fibonacci({n}) using matrix exponentiation = {fibonacci_matrix(n)}")
\ No newline at end of file
+    # Large results have more digits than Python 3.11+ converts to str by default
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+    
+    if run_all:
+        print(f"Fibonacci({n}) using memoization = {fibonacci_memo(n)}")
+        print(f"Fibonacci({n}) using iteration = {fibonacci_iterative(n)}")
+        print(f"Fibonacci({n}) using matrix exponentiation = {fibonacci_matrix(n)}")
+    else:
+        print(f"Fibonacci({n}) = {fibonacci(n)}")
\ No newline at end of file
@@ -10,7 +10,10 @@ import sys
 import json
 import time
 import re
+import asyncio
+import signal
 import subprocess
+from collections import deque
 from pathlib import Path
 
 # Import project modules
@@ -20,6 +23,41 @@ from src.logger import setup_logger
 # Setup logger
 logger = setup_logger(__name__, level="DEBUG")
 
+# Patterns for the ACTION format requested in the system prompt
+_SHELL_RE = re.compile(r'ACTION:\s*shell\s*\nCOMMAND:\s*(.*?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+_RESPOND_RE = re.compile(r'ACTION:\s*respond\s*\nCONTENT:\s*(.*?)(?:\n\n|$)', re.IGNORECASE | re.DOTALL)
+_ERROR_RE = re.compile(r'ACTION:\s*error\s*\nREASON:\s*(.*?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+
+# System prompt shared by every request; the user command is sent as a separate message
+# so the system prompt stays byte-identical and LLM servers can reuse their prefix cache
+_STATIC_SYSTEM_PROMPT = """
+You are helping process user commands in a command-line interface.
+
+Based on the user's command, do one of these:
+1. If it's a system command (like checking time, listing files, etc.), reply with:
+   ACTION: shell
+   COMMAND: <the exact shell command to run>
+
+2. If it's a question or conversation, reply with:
+   ACTION: respond
+   CONTENT: <your helpful response>
+
+3. If there's an error or you can't process it, reply with:
+   ACTION: error
+   REASON: <explanation of the error>
+
+Reply using ONLY this format, with no additional text.
+"""
+
+# Generation settings for interpreting a command with the LLM
+_GENERATE_OPTIONS = {"max_tokens": 1024, "temperature": 0.7}
+
+# Commands run directly as shell commands without asking the LLM
+_SHELL_PREFIXES = frozenset({"ls", "pwd", "date"})
+
+# Commands run directly only when given an argument; a bare "cat" would wait for input
+_SHELL_PREFIXES_WITH_ARGS = frozenset({"cd", "cat", "echo"})
+
 class Agent:
     """
     Agent class that serves as the central coordinator of the AI system.
@@ -51,8 +89,8 @@ class Agent:
             logger.error(f"Failed to initialize LLM interface: {str(e)}")
             raise
         
-        # Command history
-        self.command_history = []
+        # Command history, keeping only the most recent commands
+        self.command_history = deque(maxlen=1024)
         
         # Agent state
         self.running = False
@@ -79,83 +117,152 @@ class Agent:
         Returns:
             dict: Response with status and content
         """
-        logger.info(f"Processing command: {command}")
-        
-        # Add to command history
-        self.command_history.append(command)
-        
         try:
-            # First, simply try to interpret as "shell_command" the most common commands
-            if command.startswith("ls") or command.startswith("cd ") or command.startswith("pwd") or \
-               command.startswith("cat ") or command.startswith("date") or command.startswith("echo "):
-                action = {"type": "shell_command", "command": command}
-                logger.debug(f"Direct shell command interpretation: {action}")
-            else:
-                # Generate system prompt with the command
-                prompt = self._create_system_prompt(command)
-                
-                # Get response from LLM
-                llm_response = self.llm.generate(
-                    prompt=prompt,
-                    max_tokens=1024,
-                    temperature=0.7
-                )
-                
-                logger.debug(f"LLM response: {llm_response}")
-                
-                # Parse LLM response to determine action
-                action = self._parse_llm_response(llm_response)
-                logger.debug(f"Parsed action: {action}")
+            # First, simply try to interpret as "shell_command" the most common commands,
+            # before any logging, history, prompt building or LLM round-trip
+            action = self._direct_shell_action(command)
+            self._record_command(command)
+            
+            if action is None:
+                # Get response from LLM and parse it to determine action
+                llm_response = self.llm.generate(messages=self._create_messages(command), **_GENERATE_OPTIONS)
+                action = self._resolve_action(llm_response)
             
             # Execute the determined action
             result = self._execute_action(action)
+            return self._wrap_result(command, action, result)
             
-            logger.info(f"Command processed successfully: {command}")
-            return {
-                "status": "success",
-                "action": action.get("type", "response"),
-                "result": result
-            }
+        except Exception as e:
+            return self._error_result(command, e)
+    
+    async def process_command_async(self, command):
+        """
+        Process a user command without blocking the event loop.
+        The LLM call runs in a worker thread and shell commands run as asyncio
+        subprocesses, so several commands can be in flight at once.
+        
+        Args:
+            command (str): The command string to process
+            
+        Returns:
+            dict: Response with status and content
+        """
+        try:
+            action = self._direct_shell_action(command)
+            self._record_command(command)
+            
+            if action is None:
+                llm_response = await asyncio.to_thread(
+                    self.llm.generate,
+                    messages=self._create_messages(command),
+                    **_GENERATE_OPTIONS
+                )
+                action = self._resolve_action(llm_response)
+            
+            if action.get("type") == "shell_command":
+                result = await self._execute_shell_command_async(action.get("command", "").strip())
+            else:
+                result = self._execute_action(action)
+            return self._wrap_result(command, action, result)
             
         except Exception as e:
-            logger.error(f"Error processing command '{command}': {str(e)}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
+            return self._error_result(command, e)
+    
+    def _record_command(self, command):
+        """
+        Log a command and add it to the command history.
+        
+        Args:
+            command (str): The command being processed
+        """
+        logger.info("Processing command: %s", command)
+        
+        # Add to command history (an O(1) deque append, no copying)
+        self.command_history.append(command)
+    
+    def _resolve_action(self, llm_response):
+        """
+        Determine the action for a command from the LLM response.
+        
+        Args:
+            llm_response (str): The LLM response text
+            
+        Returns:
+            dict: The parsed action
+        """
+        logger.debug("LLM response: %s", llm_response)
+        action = self._parse_llm_response(llm_response)
+        logger.debug("Parsed action: %s", action)
+        return action
+    
+    def _wrap_result(self, command, action, result):
+        """
+        Build the response for a successfully processed command.
+        
+        Args:
+            command (str): The command that was processed
+            action (dict): The action that was executed
+            result (dict): The result of the action
+            
+        Returns:
+            dict: Response with status, action type, and result
+        """
+        logger.info("Command processed successfully: %s", command)
+        return {
+            "status": "success",
+            "action": action.get("type", "response"),
+            "result": result
+        }
+    
+    def _error_result(self, command, error):
+        """
+        Build the response for a command that failed to process.
+        
+        Args:
+            command (str): The command that failed
+            error (Exception): The exception raised while processing it
+            
+        Returns:
+            dict: Response with error status and message
+        """
+        logger.error("Error processing command '%s': %s", command, error)
+        return {
+            "status": "error",
+            "error": str(error)
+        }
     
-    def _create_system_prompt(self, command):
+    def _direct_shell_action(self, command):
         """
-        Create a system prompt for the LLM with the user command.
+        Recognize common shell commands that can run without asking the LLM.
         
         Args:
             command (str): The user command
             
         Returns:
-            str: The formatted system prompt
+            dict or None: A shell_command action, or None if the LLM must interpret the command
         """
-        # Simple prompt template
-        prompt = f"""
-You are helping process user commands in a command-line interface.
-
-User command: "{command}"
-
-Based on this command, do one of these:
-1. If it's a system command (like checking time, listing files, etc.), reply with:
-   ACTION: shell
-   COMMAND: <the exact shell command to run>
-
-2. If it's a question or conversation, reply with:
-   ACTION: respond
-   CONTENT: <your helpful response>
-
-3. If there's an error or you can't process it, reply with:
-   ACTION: error
-   REASON: <explanation of the error>
-
-Reply using ONLY this format, with no additional text.
-"""
-        return prompt
+        words = command.split(maxsplit=1)
+        if words and (words[0] in _SHELL_PREFIXES or (len(words) == 2 and words[0] in _SHELL_PREFIXES_WITH_ARGS)):
+            action = {"type": "shell_command", "command": command}
+            logger.debug("Direct shell command interpretation: %s", action)
+            return action
+        return None
+    
+    def _create_messages(self, command):
+        """
+        Create the chat messages for the LLM: the static system prompt
+        followed by the user command.
+        
+        Args:
+            command (str): The user command
+            
+        Returns:
+            list of dict: The system and user messages
+        """
+        return [
+            {"role": "system", "content": _STATIC_SYSTEM_PROMPT},
+            {"role": "user", "content": command}
+        ]
     
     def _parse_llm_response(self, response):
         """
@@ -170,17 +277,17 @@ Reply using ONLY this format, with no additional text.
         try:
             # First try to parse using the simple format
             # Look for ACTION: <type> followed by the appropriate field
-            shell_match = re.search(r'ACTION:\s*shell\s*\nCOMMAND:\s*(.*?)(?:\n|$)', response, re.IGNORECASE | re.DOTALL)
+            shell_match = _SHELL_RE.search(response)
             if shell_match:
                 command = shell_match.group(1).strip()
                 return {"type": "shell_command", "command": command}
                 
-            respond_match = re.search(r'ACTION:\s*respond\s*\nCONTENT:\s*(.*?)(?:\n\n|$)', response, re.IGNORECASE | re.DOTALL)
+            respond_match = _RESPOND_RE.search(response)
             if respond_match:
                 content = respond_match.group(1).strip()
                 return {"type": "response", "content": content}
                 
-            error_match = re.search(r'ACTION:\s*error\s*\nREASON:\s*(.*?)(?:\n|$)', response, re.IGNORECASE | re.DOTALL)
+            error_match = _ERROR_RE.search(response)
             if error_match:
                 error = error_match.group(1).strip()
                 return {"type": "error", "error": error}
@@ -242,49 +349,132 @@ Reply using ONLY this format, with no additional text.
         if not command:
             return {"error": "Empty command"}
         
-        logger.info(f"Executing shell command: {command}")
+        logger.info("Executing shell command: %s", command)
         
         try:
-            # Execute the command
-            process = subprocess.Popen(
+            # Run in a new session so a timeout can kill everything the shell started,
+            # without the agent's stdin so commands cannot block reading the terminal
+            with subprocess.Popen(
                 command,
                 shell=True,
+                stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                text=True,
+                start_new_session=True
+            ) as process:
+                # Set a timeout (30 seconds)
+                try:
+                    stdout, stderr = process.communicate(timeout=30)
+                except subprocess.TimeoutExpired:
+                    # Kill the whole process group, then reap it
+                    if os.name == "posix":
+                        os.killpg(process.pid, signal.SIGKILL)
+                    else:
+                        process.kill()
+                    process.communicate()
+                    return self._shell_timeout_result(command)
+            
+            return self._shell_result(command, stdout, stderr, process.returncode)
+                
+        except Exception as e:
+            logger.error("Error executing command '%s': %s", command, e)
+            return {
+                "status": "error",
+                "error": f"Command execution failed: {str(e)}"
+            }
+    
+    async def _execute_shell_command_async(self, command):
+        """
+        Execute a shell command as an asyncio subprocess.
+        
+        Args:
+            command (str): The shell command to execute
+            
+        Returns:
+            dict: The result with stdout, stderr, and return code
+        """
+        if not command:
+            return {"error": "Empty command"}
+        
+        logger.info("Executing shell command: %s", command)
+        
+        try:
+            # Run in a new session so a timeout can kill everything the shell started,
+            # without the agent's stdin so commands cannot block reading the terminal
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
             
             # Set a timeout (30 seconds)
             try:
-                stdout, stderr = process.communicate(timeout=30)
-                return_code = process.returncode
-                
-                result = {
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "return_code": return_code
-                }
-                
-                if return_code != 0:
-                    logger.warning(f"Command returned non-zero exit code {return_code}: {command}")
-                    result["status"] = "error"
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
+            except asyncio.TimeoutError:
+                # Kill the whole process group, then reap it
+                if os.name == "posix":
+                    os.killpg(process.pid, signal.SIGKILL)
                 else:
-                    result["status"] = "success"
-                    
-                return result
-                
-            except subprocess.TimeoutExpired:
-                # Kill the process if it times out
-                process.kill()
-                logger.error(f"Command timed out after 30 seconds: {command}")
-                return {
-                    "status": "error",
-                    "error": "Command execution timed out after 30 seconds"
-                }
+                    process.kill()
+                await process.communicate()
+                return self._shell_timeout_result(command)
+            
+            return self._shell_result(
+                command,
+                stdout.decode(errors="replace"),
+                stderr.decode(errors="replace"),
+                process.returncode
+            )
                 
         except Exception as e:
-            logger.error(f"Error executing command '{command}': {str(e)}")
+            logger.error("Error executing command '%s': %s", command, e)
             return {
                 "status": "error",
                 "error": f"Command execution failed: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    def _shell_result(self, command, stdout, stderr, return_code):
+        """
+        Build the result of a finished shell command.
+        
+        Args:
+            command (str): The shell command that ran
+            stdout (str): Captured standard output
+            stderr (str): Captured standard error
+            return_code (int): Exit code of the command
+            
+        Returns:
+            dict: The result with stdout, stderr, return code, and status
+        """
+        result = {
+            "stdout": stdout,
+            "stderr": stderr,
+            "return_code": return_code
+        }
+        
+        if return_code != 0:
+            logger.warning("Command returned non-zero exit code %s: %s", return_code, command)
+            result["status"] = "error"
+        else:
+            result["status"] = "success"
+            
+        return result
+    
+    def _shell_timeout_result(self, command):
+        """
+        Build the result of a shell command that timed out.
+        
+        Args:
+            command (str): The shell command that timed out
+            
+        Returns:
+            dict: The error result
+        """
+        logger.error("Command timed out after 30 seconds: %s", command)
+        return {
+            "status": "error",
+            "error": "Command execution timed out after 30 seconds"
+        }
\ No newline at end of file
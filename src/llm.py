@@ -7,8 +7,13 @@ or with Ollama's local API, or through direct model loading.
 
 import os
 import json
+import logging
 import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 
 # Import logger
@@ -17,6 +22,28 @@ from src.logger import setup_logger
 # Setup logger
 logger = setup_logger(__name__)
 
+class _GenerationError(Exception):
+    """Raised by the generation backends; the message is returned to the caller as text"""
+
+def _join_messages(messages):
+    """
+    Flatten chat messages into a single prompt for backends without a chat endpoint.
+    System messages are kept verbatim, other messages are prefixed with their role.
+    
+    Args:
+        messages (list of dict): Chat messages ({"role": ..., "content": ...})
+        
+    Returns:
+        str: The combined prompt
+    """
+    parts = []
+    for message in messages:
+        if message["role"] == "system":
+            parts.append(message["content"].strip())
+        else:
+            parts.append(f'{message["role"].capitalize()}: {message["content"]}')
+    return "\n\n".join(parts)
+
 class QwenModel:
     """
     Interface to LLM models.
@@ -26,7 +53,8 @@ class QwenModel:
     3. Ollama mode: Sends requests to a local Ollama server
     """
     
-    def __init__(self, model_path=None, api_url=None, ollama_url=None, model_name="llama3"):
+    def __init__(self, model_path=None, api_url=None, ollama_url=None, model_name="llama3", cache_size=1024,
+                 semantic_threshold=None, embedding_model=None):
         """
         Initialize the model interface.
         
@@ -35,6 +63,14 @@ class QwenModel:
             api_url (str, optional): URL of the API server, if using API mode
             ollama_url (str, optional): URL of the Ollama server (e.g., http://localhost:11434)
             model_name (str, optional): Name of the Ollama model to use (default: llama3)
+            cache_size (int, optional): Maximum number of cached responses, 0 to disable (default: 1024)
+            semantic_threshold (float, optional): Cosine similarity above which a cached response
+                is reused for a different but equivalent final message, when all earlier messages
+                are identical (Ollama mode only, default: disabled). A semantic hit can return a
+                response meant for a different request, such as the shell action for a command
+                that differs in one argument, so do not enable it where responses drive shell
+                execution
+            embedding_model (str, optional): Ollama model used to embed prompts (default: model_name)
         """
         self.model = None
         self.tokenizer = None
@@ -42,6 +78,27 @@ class QwenModel:
         self.ollama_url = ollama_url
         self.model_name = model_name
         
+        # LRU cache of deterministic (temperature 0) responses
+        self.cache_size = cache_size
+        self._response_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Semantic cache: ring buffer of unit prompt embeddings and their responses
+        self.semantic_threshold = None
+        self.embedding_model = embedding_model or model_name
+        self._sem_matrix = None
+        self._sem_entries = []
+        self._sem_count = 0
+        self._sem_next = 0
+        
+        # One pooled HTTP session so keep-alive connections are reused across calls;
+        # the pool is sized for concurrent callers such as the API server's worker threads
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
         # Determine mode of operation
         if ollama_url:
             # Ollama mode
@@ -49,11 +106,20 @@ class QwenModel:
             self.ollama_url = ollama_url.rstrip('/')  # Remove any trailing slash
             logger.info(f"Initialized LLM interface in Ollama mode with URL: {self.ollama_url}, model: {model_name}")
             
+            # Resolve endpoint URLs once
+            self._completion_endpoint = f"{self.ollama_url}/api/completion"
+            self._chat_endpoint = f"{self.ollama_url}/api/chat"
+            self._embeddings_endpoint = f"{self.ollama_url}/api/embeddings"
+            
+            # Generation endpoint known to exist on this server, None until found
+            self._ollama_endpoint = None
+            
             # Try to check if Ollama is available
             try:
-                response = requests.get(f"{self.ollama_url}/api/version", timeout=5)
+                response = self._session.get(f"{self.ollama_url}/api/version", timeout=5)
                 response.raise_for_status()
                 logger.info(f"Connected to Ollama version: {response.json().get('version', 'unknown')}")
+                self._ollama_endpoint = self._probe_ollama_endpoint()
             except Exception as e:
                 logger.warning(f"Could not connect to Ollama: {str(e)}")
                 logger.warning("Continuing anyway, will attempt to connect when needed")
@@ -62,6 +128,7 @@ class QwenModel:
             # API mode
             self.mode = "api"
             self.api_url = api_url
+            self._query_endpoint = f"{api_url}/query"
             logger.info(f"Initialized LLM interface in API mode with URL: {api_url}")
         elif model_path:
             # Direct mode - load model weights
@@ -85,6 +152,14 @@ class QwenModel:
             # No parameters provided
             logger.error("No mode parameters (model_path, api_url, or ollama_url) provided")
             raise ValueError("Either model_path, api_url, or ollama_url must be provided")
+        
+        # Prompt embeddings come from Ollama, so the semantic cache needs Ollama mode
+        if semantic_threshold is not None and cache_size:
+            if self.mode == "ollama":
+                self.semantic_threshold = semantic_threshold
+                logger.info(f"Semantic cache enabled with threshold {semantic_threshold} using {self.embedding_model}")
+            else:
+                logger.warning("Semantic cache requires Ollama mode, disabling it")
 
     def _load_model_from_path(self, model_path):
         """
@@ -108,133 +183,354 @@ class QwenModel:
         self.model = "dummy_model"
         self.tokenizer = "dummy_tokenizer"
         
-    def generate(self, prompt, max_tokens=1024, temperature=0.7, top_p=0.9):
+    def generate(self, prompt=None, max_tokens=1024, temperature=0.7, top_p=0.9, messages=None):
         """
         Generate a response based on the input prompt.
+        Responses for temperature 0 are deterministic and are served from an
+        in-process LRU cache when the same request repeats. If a semantic
+        threshold is set, a response cached for a sufficiently similar final
+        message, with identical earlier messages, is reused as well. Sampled responses (temperature > 0) are never cached.
         
         Args:
-            prompt (str): The input text to generate a response for
+            prompt (str, optional): The input text to generate a response for
             max_tokens (int): Maximum number of tokens to generate
             temperature (float): Sampling temperature (higher = more creative, lower = more focused)
             top_p (float): Nucleus sampling parameter
+            messages (list of dict, optional): Chat messages ({"role": ..., "content": ...})
+                to send instead of a single prompt. They are passed as-is to the Ollama
+                chat endpoint and joined into one prompt for the other backends.
             
         Returns:
-            str: The generated text response
+            str: The generated text response, or only an error message if generation
+                fails (text received before a failure is discarded)
         """
+        try:
+            return "".join(self._generate_chunks(prompt, max_tokens, temperature, top_p, messages))
+        except _GenerationError as e:
+            return str(e)
+    
+    def generate_stream(self, prompt=None, max_tokens=1024, temperature=0.7, top_p=0.9, messages=None):
+        """
+        Generate a response based on the input prompt, yielding text as it arrives.
+        Caching behaves as described for generate; a cached response is
+        yielded as a single chunk. On failure an error message is yielded after
+        any text already sent, so callers that act on the complete response
+        should use generate instead.
+        
+        Args:
+            prompt (str, optional): The input text to generate a response for
+            max_tokens (int): Maximum number of tokens to generate
+            temperature (float): Sampling temperature (higher = more creative, lower = more focused)
+            top_p (float): Nucleus sampling parameter
+            messages (list of dict, optional): Chat messages to send instead of a single prompt
+            
+        Yields:
+            str: Successive chunks of the generated text
+        """
+        try:
+            yield from self._generate_chunks(prompt, max_tokens, temperature, top_p, messages)
+        except _GenerationError as e:
+            yield str(e)
+    
+    def _generate_chunks(self, prompt, max_tokens, temperature, top_p, messages):
+        """
+        Yield the response chunks from the cache or the active backend, caching
+        the complete response when the request is cacheable.
+        
+        Args:
+            prompt (str or None): The input text
+            max_tokens (int): Maximum number of tokens to generate
+            temperature (float): Sampling temperature
+            top_p (float): Nucleus sampling parameter
+            messages (list of dict or None): Chat messages to send instead of a single prompt
+            
+        Yields:
+            str: Successive chunks of the generated text
+            
+        Raises:
+            _GenerationError: If the backend fails, including partway through a response
+        """
+        if messages is None:
+            if prompt is None:
+                raise ValueError("Either prompt or messages must be provided")
+            messages = [{"role": "user", "content": prompt}]
+        elif prompt is None:
+            prompt = _join_messages(messages)
+        
+        cache_key = None
+        if temperature == 0 and self.cache_size:
+            conversation = tuple((message["role"], message["content"]) for message in messages)
+            cache_key = (conversation, max_tokens, round(top_p, 3))
+            with self._cache_lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    self._response_cache.move_to_end(cache_key)
+            if cached is not None:
+                logger.debug("Serving response from cache")
+                yield cached
+                return
+        
+        embedding = None
+        if cache_key is not None and self.semantic_threshold is not None:
+            # Only the final message is compared by similarity; the earlier ones (such
+            # as a shared system prompt) would dominate the embedding, so they must
+            # match exactly along with the generation parameters
+            semantic_params = (conversation[:-1],) + cache_key[1:]
+            embedding = self._embed(messages[-1]["content"])
+            if embedding is not None:
+                cached = self._semantic_lookup(embedding, semantic_params)
+                if cached is not None:
+                    logger.debug("Serving response from semantic cache")
+                    yield cached
+                    return
+        
         if self.mode == "ollama":
-            return self._generate_via_ollama(prompt, max_tokens, temperature, top_p)
+            stream = self._stream_via_ollama(prompt, messages, max_tokens, temperature, top_p)
         elif self.mode == "api":
-            return self._generate_via_api(prompt, max_tokens, temperature, top_p)
+            stream = self._stream_via_api(prompt, max_tokens, temperature, top_p)
         else:
-            return self._generate_direct(prompt, max_tokens, temperature, top_p)
+            stream = self._stream_direct(prompt, max_tokens, temperature, top_p)
+        
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        
+        if cache_key is not None:
+            response = "".join(chunks)
+            with self._cache_lock:
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > self.cache_size:
+                    self._response_cache.popitem(last=False)
+            if embedding is not None:
+                self._semantic_store(embedding, semantic_params, response)
     
-    def _generate_via_ollama(self, prompt, max_tokens, temperature, top_p):
+    def generate_batch(self, prompts, max_tokens=1024, temperature=0.7, top_p=0.9):
         """
-        Generate text by querying the Ollama API.
+        Generate responses for several prompts that share the same parameters.
+        The placeholder direct model has no batched forward pass, so each prompt
+        is generated in turn; a real model would run them as one batch here.
         
         Args:
-            prompt (str): The input text
-            max_tokens (int): Maximum tokens to generate
-            temperature (float): Temperature parameter
-            top_p (float): Top-p parameter
+            prompts (list of str): The input texts
+            max_tokens (int): Maximum number of tokens to generate
+            temperature (float): Sampling temperature
+            top_p (float): Nucleus sampling parameter
             
         Returns:
-            str: The generated text
+            list of str: The generated responses, in the same order as prompts
         """
-        # First, try direct completion endpoint (older Ollama versions)
-        try:
-            endpoint = f"{self.ollama_url}/api/completion"
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "top_p": top_p,
-                    "num_predict": max_tokens
-                }
-            }
-            
-            logger.debug(f"Trying completion endpoint: {endpoint}")
-            start_time = time.time()
+        logger.debug("Generating batch of %d prompts", len(prompts))
+        return [self.generate(prompt, max_tokens, temperature, top_p) for prompt in prompts]
+    
+    def _embed(self, text):
+        """
+        Embed text with the Ollama embeddings endpoint.
+        
+        Args:
+            text (str): The text to embed
             
-            response = requests.post(
-                endpoint,
-                json=payload,
-                timeout=120  # 120 second timeout for larger models
+        Returns:
+            numpy.ndarray or None: Unit-length embedding, or None if it could not be computed
+        """
+        try:
+            response = self._session.post(
+                self._embeddings_endpoint,
+                json={"model": self.embedding_model, "prompt": text},
+                timeout=30
             )
-            
-            if response.status_code == 200:
-                elapsed_time = time.time() - start_time
-                logger.debug(f"Response received from Ollama completion in {elapsed_time:.2f}s")
-                
-                result = response.json()
-                logger.debug(f"Ollama completion response: {json.dumps(result)}")
-                
-                if "response" in result:
-                    return result["response"]
-                else:
-                    logger.error(f"Unexpected Ollama API completion response format: {result}")
-            else:
-                logger.warning(f"Completion endpoint failed with status {response.status_code}, trying chat endpoint")
+            response.raise_for_status()
+            embedding = np.asarray(response.json()["embedding"], dtype=np.float32)
         except Exception as e:
-            logger.warning(f"Error with completion endpoint, trying chat endpoint: {str(e)}")
+            logger.warning(f"Could not embed prompt for semantic cache: {str(e)}")
+            return None
+        
+        norm = np.linalg.norm(embedding)
+        if embedding.ndim != 1 or not norm:
+            return None
+        return embedding / norm
+    
+    def _semantic_lookup(self, embedding, params):
+        """
+        Find the cached response whose prompt is most similar to the given embedding.
+        
+        Args:
+            embedding (numpy.ndarray): Unit-length prompt embedding
+            params (tuple): Earlier messages and generation parameters the cached response must match
             
-        # If that fails, try the chat endpoint (newer Ollama versions)
-        try:
-            endpoint = f"{self.ollama_url}/api/chat"
-            payload = {
-                "model": self.model_name,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "top_p": top_p,
-                    "num_predict": max_tokens
-                }
-            }
+        Returns:
+            str or None: The cached response, or None if nothing is similar enough
+        """
+        with self._cache_lock:
+            if not self._sem_count or self._sem_matrix.shape[1] != embedding.shape[0]:
+                return None
+            # Only entries with the same params can be reused, so pick the best among those
+            rows = [i for i in range(self._sem_count) if self._sem_entries[i][0] == params]
+            if not rows:
+                return None
+            similarities = self._sem_matrix[rows] @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.semantic_threshold:
+                return None
+            return self._sem_entries[rows[best]][1]
+    
+    def _semantic_store(self, embedding, params, response):
+        """
+        Store a response in the semantic cache, evicting the oldest entry when full.
+        
+        Args:
+            embedding (numpy.ndarray): Unit-length prompt embedding
+            params (tuple): Earlier messages and generation parameters used for the response
+            response (str): The generated text
+        """
+        with self._cache_lock:
+            if self._sem_matrix is None:
+                self._sem_matrix = np.zeros((self.cache_size, embedding.shape[0]), dtype=np.float32)
+                self._sem_entries = [None] * self.cache_size
+            elif self._sem_matrix.shape[1] != embedding.shape[0]:
+                return
             
-            logger.debug(f"Trying chat endpoint: {endpoint}")
-            start_time = time.time()
+            slot = self._sem_next
+            self._sem_matrix[slot] = embedding
+            self._sem_entries[slot] = (params, response)
+            self._sem_next = (slot + 1) % self.cache_size
+            self._sem_count = min(self._sem_count + 1, self.cache_size)
+    
+    def _probe_ollama_endpoint(self):
+        """
+        Find which generation endpoint the Ollama server provides.
+        An empty request body is rejected by an existing endpoint (e.g. with 400)
+        without running the model, while a missing endpoint answers 404.
+        
+        Returns:
+            str or None: The completion or chat endpoint URL, or None if neither was found
+        """
+        try:
+            for endpoint in (self._completion_endpoint, self._chat_endpoint):
+                response = self._session.post(endpoint, json={}, timeout=5)
+                if response.status_code != 404:
+                    logger.info(f"Using Ollama endpoint: {endpoint}")
+                    return endpoint
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not probe Ollama endpoints: {str(e)}")
+            return None
+        
+        logger.warning("Could not find an Ollama generation endpoint, will retry when needed")
+        return None
+    
+    def _stream_via_ollama(self, prompt, messages, max_tokens, temperature, top_p):
+        """
+        Stream generated text from the Ollama API.
+        Uses the endpoint found to work on this server, and only tries the other
+        one (completion for older Ollama versions, chat for newer ones) if the
+        server answers 404. Ollama streams one JSON object per line.
+        
+        Args:
+            prompt (str): The input text, sent to the completion endpoint
+            messages (list of dict): The chat messages, sent to the chat endpoint
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Temperature parameter
+            top_p (float): Top-p parameter
             
-            response = requests.post(
-                endpoint,
-                json=payload,
-                timeout=120  # 120 second timeout for larger models
-            )
+        Yields:
+            str: Chunks of the generated text
             
-            if response.status_code == 200:
-                elapsed_time = time.time() - start_time
-                logger.debug(f"Response received from Ollama chat in {elapsed_time:.2f}s")
-                
-                result = response.json()
-                logger.debug(f"Ollama chat response: {json.dumps(result)}")
-                
-                if "message" in result and "content" in result["message"]:
-                    return result["message"]["content"]
+        Raises:
+            _GenerationError: If no valid response could be obtained
+        """
+        options = {
+            "temperature": temperature,
+            "top_p": top_p,
+            "num_predict": max_tokens
+        }
+        
+        if self._ollama_endpoint == self._chat_endpoint:
+            endpoints = (self._chat_endpoint, self._completion_endpoint)
+        else:
+            endpoints = (self._completion_endpoint, self._chat_endpoint)
+        
+        try:
+            for endpoint in endpoints:
+                is_chat = endpoint == self._chat_endpoint
+                if is_chat:
+                    payload = {
+                        "model": self.model_name,
+                        "messages": messages,
+                        "stream": True,
+                        "options": options
+                    }
                 else:
-                    logger.error(f"Unexpected Ollama API chat response format: {result}")
-            else:
-                logger.warning(f"Chat endpoint failed with status {response.status_code}")
+                    payload = {
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": True,
+                        "options": options
+                    }
+                
+                logger.debug("Sending request to Ollama endpoint: %s", endpoint)
+                start_time = time.time()
                 
-            # Both methods failed but we got some response, return its content
-            return f"Error: Could not get a valid response from Ollama API. Status code: {response.status_code}"
+                with self._session.post(
+                    endpoint,
+                    json=payload,
+                    stream=True,
+                    timeout=120  # 120 second timeout for larger models
+                ) as response:
+                    if response.status_code == 404:
+                        logger.warning(f"Ollama endpoint not found: {endpoint}")
+                        continue
+                    self._ollama_endpoint = endpoint
+                    
+                    if response.status_code != 200:
+                        logger.warning(f"Ollama endpoint {endpoint} failed with status {response.status_code}")
+                        raise _GenerationError(f"Error: Could not get a valid response from Ollama API. Status code: {response.status_code}")
+                    
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        result = json.loads(line)
+                        
+                        if result.get("done"):
+                            elapsed_time = time.time() - start_time
+                            logger.debug("Response received from Ollama in %.2fs", elapsed_time)
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Ollama final response: %s", json.dumps(result))
+                        
+                        if is_chat and "content" in result.get("message", {}):
+                            text = result["message"]["content"]
+                        elif not is_chat and "response" in result:
+                            text = result["response"]
+                        elif result.get("done"):
+                            text = ""
+                        else:
+                            logger.error(f"Unexpected Ollama API response format: {result}")
+                            raise _GenerationError("Error: Unexpected response format from Ollama API")
+                        
+                        if text:
+                            yield text
+                        if result.get("done"):
+                            break
+                    return
+            
+            # Neither endpoint exists on this server
+            raise _GenerationError("Error: Could not get a valid response from Ollama API. Status code: 404")
                 
+        except _GenerationError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Ollama API request failed: {str(e)}")
-            return f"Error communicating with Ollama API server: {str(e)}"
+            raise _GenerationError(f"Error communicating with Ollama API server: {str(e)}")
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Ollama API response: {str(e)}")
-            return "Error parsing response from Ollama API server"
+            raise _GenerationError("Error parsing response from Ollama API server")
         except Exception as e:
             logger.error(f"Unexpected error in Ollama API request: {str(e)}")
-            return f"Unexpected error with Ollama: {str(e)}"
+            raise _GenerationError(f"Unexpected error with Ollama: {str(e)}")
     
-    def _generate_via_api(self, prompt, max_tokens, temperature, top_p):
+    def _stream_via_api(self, prompt, max_tokens, temperature, top_p):
         """
         Generate text by querying the API server.
+        The server answers with the complete text, which is yielded as one chunk.
         
         Args:
             prompt (str): The input text
@@ -242,11 +538,14 @@ class QwenModel:
             temperature (float): Temperature parameter
             top_p (float): Top-p parameter
             
-        Returns:
+        Yields:
             str: The generated text
+            
+        Raises:
+            _GenerationError: If no valid response could be obtained
         """
         try:
-            endpoint = f"{self.api_url}/query"
+            endpoint = self._query_endpoint
             payload = {
                 "prompt": prompt,
                 "max_tokens": max_tokens,
@@ -254,17 +553,17 @@ class QwenModel:
                 "top_p": top_p
             }
             
-            logger.debug(f"Sending request to {endpoint}")
+            logger.debug("Sending request to %s", endpoint)
             start_time = time.time()
             
-            response = requests.post(
+            response = self._session.post(
                 endpoint,
                 json=payload,
                 timeout=60  # 60 second timeout
             )
             
             elapsed_time = time.time() - start_time
-            logger.debug(f"Response received in {elapsed_time:.2f}s")
+            logger.debug("Response received in %.2fs", elapsed_time)
             
             # Check for HTTP errors
             response.raise_for_status()
@@ -274,21 +573,23 @@ class QwenModel:
             
             if "response" not in result:
                 logger.error(f"Unexpected API response format: {result}")
-                return "Error: Unexpected response format from API"
+                raise _GenerationError("Error: Unexpected response format from API")
                 
-            return result["response"]
-            
+        except _GenerationError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {str(e)}")
-            return f"Error communicating with API server: {str(e)}"
+            raise _GenerationError(f"Error communicating with API server: {str(e)}")
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse API response: {str(e)}")
-            return "Error parsing response from API server"
+            raise _GenerationError("Error parsing response from API server")
         except Exception as e:
             logger.error(f"Unexpected error in API request: {str(e)}")
-            return f"Unexpected error: {str(e)}"
+            raise _GenerationError(f"Unexpected error: {str(e)}")
+        
+        yield result["response"]
     
-    def _generate_direct(self, prompt, max_tokens, temperature, top_p):
+    def _stream_direct(self, prompt, max_tokens, temperature, top_p):
         """
         Generate text using the locally loaded model.
         
@@ -298,19 +599,25 @@ class QwenModel:
             temperature (float): Temperature parameter
             top_p (float): Top-p parameter
             
-        Returns:
-            str: The generated text
+        Yields:
+            str: Chunks of the generated text
+            
+        Raises:
+            _GenerationError: If text generation fails
         """
         # Check if model is loaded
         if self.model == "dummy_model":
             logger.warning("Using dummy model for generation")
-            return f"This is a dummy response to: {prompt}"
+            yield f"This is a dummy response to: {prompt}"
+            return
             
         try:
             # This is a placeholder for actual model inference code
             logger.info(f"Model would generate text with params: max_tokens={max_tokens}, temp={temperature}")
-            return f"This is a simulated response to: {prompt}"
+            response = f"This is a simulated response to: {prompt}"
             
         except Exception as e:
             logger.error(f"Error during text generation: {str(e)}")
-            return f"Error generating text: {str(e)}"
\ No newline at end of file
+            raise _GenerationError(f"Error generating text: {str(e)}")
+        
+        yield response
\ No newline at end of file
@@ -6,44 +6,356 @@ across all modules.
 """
 
 import os
-import logging
-from logging.handlers import RotatingFileHandler
+import sys
+import atexit
+import queue
+import threading
+import time
 from pathlib import Path
-import datetime
 
-# Get project root directory
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-LOG_DIR = os.path.join(PROJECT_ROOT, "log")
+# Use the picologging C implementation when installed; it is API-compatible
+# with the standard library and much faster per log call
+try:
+    import picologging as logging
+    from picologging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+except ImportError:
+    import logging
+    from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
-# Create log directory if it doesn't exist
-os.makedirs(LOG_DIR, exist_ok=True)
+# Get project root directory (no resolve(), which would stat the file system on import)
+PROJECT_ROOT = Path(__file__).parent.parent
+LOG_DIR = PROJECT_ROOT / "log"
+
+# Date part of the log file name
+_LOG_DATE_FORMAT = "%Y-%m-%d"
+
+# Log file name cache, valid until the next local midnight
+_cached_name = None
+_cached_until = 0.0
 
 # Log file naming convention
 def get_log_filename():
-    """Generate log filename with current date"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    return f"agent_{today}.log"
+    """Generate log filename with current date, formatting it at most once per day"""
+    global _cached_name, _cached_until
+    now = time.time()
+    if now >= _cached_until:
+        today = time.localtime(now)
+        _cached_name = "agent_" + time.strftime(_LOG_DATE_FORMAT, today) + ".log"
+        # mktime normalizes day + 1 past the end of the month
+        _cached_until = time.mktime((today.tm_year, today.tm_mon, today.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return _cached_name
+
+# Level names accepted by setup_logger
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL
+}
+
+class FastFormatter(logging.Formatter):
+    """
+    Formatter for '%(asctime)s [%(levelname)s] %(name)s - %(message)s' that
+    builds the line by concatenation instead of %-style interpolation. The
+    " [LEVEL] " part is precomputed per level and the timestamp is reused for
+    records logged within the same second.
+    """
+    
+    def __init__(self, datefmt='%Y-%m-%d %H:%M:%S'):
+        super().__init__('%(asctime)s [%(levelname)s] %(name)s - %(message)s', datefmt=datefmt)
+        self._prefixes = {levelno: f" [{name}] " for name, levelno in _LEVELS.items()}
+        # (second, formatted time), replaced as a whole so threads never see a mixed pair
+        self._time = (None, "")
+    
+    def format(self, record):
+        """
+        Format a record exactly as the equivalent logging.Formatter would.
+        
+        Args:
+            record (logging.LogRecord): The record to format
+            
+        Returns:
+            str: The formatted log line, followed by any traceback or stack
+        """
+        second = int(record.created)
+        cached_second, asctime = self._time
+        if second != cached_second:
+            # Same as formatTime with a datefmt, which picologging's Formatter lacks
+            asctime = time.strftime(self.datefmt, time.localtime(record.created))
+            self._time = (second, asctime)
+        
+        prefix = self._prefixes.get(record.levelno)
+        if prefix is None:
+            prefix = " [" + record.levelname + "] "
+        
+        record.message = record.getMessage()
+        s = asctime + prefix + record.name + " - " + record.message
+        
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s += "\n"
+            s += record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s += "\n"
+            s += self.formatStack(record.stack_info)
+        return s
 
 # Log formatter
-LOG_FORMAT = logging.Formatter(
-    '%(asctime)s [%(levelname)s] %(name)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+LOG_FORMAT = FastFormatter()
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that buffers formatted records and writes them with
+    a single call once FLUSH_BYTES are pending or FLUSH_INTERVAL seconds after
+    the first buffered record, instead of one write per record.
+    """
+    
+    FLUSH_BYTES = 64 * 1024
+    FLUSH_INTERVAL = 0.05
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer = []
+        self._buffered = 0
+        self._file_size = None
+        self._timer = None
+        self._closed = False
+        # Guards the buffer and the stream against the flush timer thread
+        self._buffer_lock = threading.Lock()
+    
+    def emit(self, record):
+        """
+        Buffer a record, rotating the file first if it would exceed maxBytes.
+        
+        Args:
+            record (logging.LogRecord): The record to write
+        """
+        try:
+            self.write_line(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+    
+    def write_line(self, msg):
+        """
+        Buffer an already formatted line, rotating the file first if it would
+        exceed maxBytes.
+        
+        Args:
+            msg (str): The formatted line, including its trailing newline
+        """
+        with self._buffer_lock:
+            if self._should_rotate(len(msg)):
+                self._write_buffer()
+                self.doRollover()
+                self._file_size = 0
+            
+            self._buffer.append(msg)
+            self._buffered += len(msg)
+            if self._buffered >= self.FLUSH_BYTES:
+                self._write_buffer()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        """Write all buffered records to the file"""
+        with self._buffer_lock:
+            self._timer = None
+            if not self._closed:
+                self._write_buffer()
+    
+    def close(self):
+        """Write buffered records, then close the file"""
+        with self._buffer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._closed:
+                self._write_buffer()
+            self._closed = True
+        super().close()
+    
+    def _should_rotate(self, size):
+        """
+        Check whether adding size characters would take the file past maxBytes.
+        The caller holds _buffer_lock.
+        """
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        if self._file_size is None:
+            self.stream.seek(0, 2)
+            self._file_size = self.stream.tell()
+        return self._file_size + self._buffered + size >= self.maxBytes
+    
+    def _write_buffer(self):
+        """Write the buffer to the file in one call. The caller holds _buffer_lock."""
+        if not self._buffer:
+            return
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.write("".join(self._buffer))
+        self.stream.flush()
+        if self._file_size is not None:
+            self._file_size += self._buffered
+        self._buffer.clear()
+        self._buffered = 0
+
+class DualHandler(logging.Handler):
+    """
+    Handler that formats each record once and writes it to both the log file
+    and the console. The file is opened, and the log directory created, only
+    when the first record is emitted, so importing and configuring loggers
+    does no file system work. Only records from loggers listed in
+    console_names go to the console.
+    """
+    
+    def __init__(self, console_stream=None):
+        super().__init__()
+        self._file = None
+        self._file_failed = False
+        self._console = console_stream if console_stream is not None else sys.stderr
+        self.console_names = set()
+    
+    def emit(self, record):
+        """
+        Write a record to the log file and, if its logger asked for it, the console.
+        
+        Args:
+            record (logging.LogRecord): The record to write
+        """
+        try:
+            msg = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        
+        # The two sinks fail independently, so an unusable log file keeps the console
+        if not self._file_failed:
+            try:
+                if self._file is None:
+                    self._file = self._open_file()
+                self._file.write_line(msg)
+            except Exception:
+                # Opening is not retried for every record; write errors on an open file may pass
+                if self._file is None:
+                    self._file_failed = True
+                self.handleError(record)
+        
+        if record.name in self.console_names:
+            try:
+                self._console.write(msg)
+                self._console.flush()
+            except Exception:
+                self.handleError(record)
+    
+    def _open_file(self):
+        """
+        Create the log directory if needed and open today's log file.
+        
+        Returns:
+            BatchedRotatingFileHandler: The handler that writes the log file
+        """
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_file_path = LOG_DIR / get_log_filename()
+        return BatchedRotatingFileHandler(
+            os.fspath(log_file_path),
+            maxBytes=10485760,  # 10 MB
+            backupCount=10
+        )
+    
+    def flush(self):
+        """Flush the log file if it has been opened"""
+        if self._file is not None:
+            self._file.flush()
+    
+    def close(self):
+        """Close the log file if it has been opened"""
+        if self._file is not None:
+            self._file.close()
+        super().close()
+
+def _console_default():
+    """
+    Decide whether loggers write to the console when setup_logger is not told.
+    The AGENT_LOG_CONSOLE environment variable forces it on ("1", "true", "yes")
+    or off (any other value); otherwise the console is used only when stderr is
+    a terminal, so redirected runs keep just the log file.
+    
+    Returns:
+        bool: True if console output should be enabled
+    """
+    value = os.environ.get("AGENT_LOG_CONSOLE")
+    if value is not None:
+        return value.strip().lower() in ("1", "true", "yes")
+    return sys.stderr.isatty()
+
+# Records are queued by the calling thread and written out by a single background
+# listener; the handlers below are created once and shared by every logger
+_log_queue = None
+_listener = None
+_shared_queue_handler = None
+_shared_dual_handler = None
+_shared_lock = threading.Lock()
+
+def _stop_listener():
+    """Write out all queued records and close the log file"""
+    _listener.stop()
+    _shared_dual_handler.close()
+
+def _get_queue_handler():
+    """
+    Return the queue handler shared by all loggers, creating the file and
+    console handler and starting the listener thread on first use.
+    
+    Returns:
+        QueueHandler: The shared handler that enqueues log records
+    """
+    global _log_queue, _listener, _shared_queue_handler, _shared_dual_handler
+    with _shared_lock:
+        if _shared_queue_handler is None:
+            # One handler writes each record to the log file in batches and to
+            # the console, formatting it once
+            _shared_dual_handler = DualHandler()
+            _shared_dual_handler.setFormatter(LOG_FORMAT)
+            
+            _log_queue = queue.SimpleQueue()
+            _listener = QueueListener(
+                _log_queue,
+                _shared_dual_handler,
+                respect_handler_level=True
+            )
+            _listener.start()
+            _shared_queue_handler = QueueHandler(_log_queue)
+            
+            # Drain the queue and flush the last batch on shutdown
+            atexit.register(_stop_listener)
+        return _shared_queue_handler
 
-def setup_logger(name, level=logging.INFO):
+def setup_logger(name, level=logging.INFO, console=None):
     """
     Setup and return a logger with the given name and level.
+    The logger only enqueues records; file and console output happen on a
+    background thread so logging calls do not block on I/O.
     
     Args:
         name (str): The name for the logger (typically __name__ from the calling module)
-        level (int or str): The logging level (default: logging.INFO)
+        level (int or str): The logging level; unknown level names fall back to INFO (default: logging.INFO)
+        console (bool, optional): Also write records to stderr. By default this is on
+            when stderr is a terminal, or as set by the AGENT_LOG_CONSOLE environment variable
         
     Returns:
-        logging.Logger: Configured logger instance
+        logging.Logger: Configured logger instance (a picologging logger when available)
     """
     # Convert string level to int if needed
     if isinstance(level, str):
-        level = getattr(logging, level.upper())
+        level = _LEVELS.get(level.upper(), logging.INFO)
         
     logger = logging.getLogger(name)
     
@@ -52,23 +364,12 @@ def setup_logger(name, level=logging.INFO):
         return logger
     
     logger.setLevel(level)
+    logger.addHandler(_get_queue_handler())
     
-    # Create a file handler that writes to the log directory
-    log_file_path = os.path.join(LOG_DIR, get_log_filename())
-    file_handler = RotatingFileHandler(
-        log_file_path,
-        maxBytes=10485760,  # 10 MB
-        backupCount=10
-    )
-    file_handler.setFormatter(LOG_FORMAT)
-    
-    # Create a console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(LOG_FORMAT)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if console is None:
+        console = _console_default()
+    if console:
+        _shared_dual_handler.console_names.add(name)
     
     return logger
 
@@ -10,72 +10,182 @@ import argparse
 import time
 from pathlib import Path
 
-# Import project modules
-from src.agent import Agent
-from src.logger import setup_logger
+# Project modules are imported in main() after argument parsing, so --help and
+# argument errors do not pay for loading the agent stack or touch the log directory
+logger = None
 
-# Setup logger
-logger = setup_logger(__name__)
+# Banners, each written with a single call
+_BANNER = """
+===================================
+  AI Agent System
+===================================
 
-def parse_arguments():
-    """Parse command line arguments"""
-    parser = argparse.ArgumentParser(description="Start the AI Agent system")
+"""
+
+_INTERACTIVE_BANNER = """
+AI Agent Interactive Mode
+Type 'exit' or 'quit' to end the session
+------------------------------
+"""
+
+# Commands that end interactive mode
+_EXIT_SET = frozenset(("exit", "quit"))
+
+def _sniff_option_groups(argv):
+    """
+    Work out which optional argument groups the command line can use, so
+    parse_arguments only builds what is needed. A group is included when any
+    "--" argument (up to any "=") is a prefix of one of its options, so
+    argparse abbreviations, including ambiguous ones, behave as if every
+    option were defined.
     
-    # Model source options - only one should be used
-    model_group = parser.add_argument_group('Model Source (use only one)')
+    Args:
+        argv (list): Command line arguments, without the program name
+        
+    Returns:
+        tuple: (include Ollama options, include --interactive)
+    """
+    names = [arg.split("=", 1)[0] for arg in argv if arg.startswith("--")]
+    if "-h" in argv or any("--help".startswith(name) for name in names):
+        # Help must show every option
+        return True, True
     
-    model_group.add_argument(
-        "--api-url",
-        type=str,
-        help="URL of the LLM API server",
-        default=None
+    needs_ollama = any(
+        option.startswith(name) for name in names for option in ("--ollama-url", "--model-name")
     )
+    needs_interactive = any("--interactive".startswith(name) for name in names)
+    return needs_ollama, needs_interactive
+
+# Option tables for the argument parser:
+# (flag, argparse keyword arguments)
+_MODEL_OPTIONS = (
+    ("--api-url", {"type": str, "help": "URL of the LLM API server", "default": None}),
+    ("--model-path", {"type": str, "help": "Path to local model weights", "default": "./local_model_weights"}),
+    ("--ollama", {"action": "store_true", "help": "Use Ollama for LLM inference"}),
+)
+
+_OLLAMA_OPTIONS = (
+    ("--ollama-url", {
+        "type": str,
+        "help": "URL of the Ollama server (default: http://localhost:11434)",
+        "default": "http://localhost:11434"
+    }),
+    ("--model-name", {
+        "type": str,
+        "help": "Name of the Ollama model to use (default: llama3)",
+        "default": "llama3"
+    }),
+)
+
+_INTERACTIVE_OPTION = (
+    "--interactive",
+    {"action": "store_true", "help": "Start in interactive mode to accept commands directly"}
+)
+
+_COMMAND_OPTION = (
+    "--command",
+    {"type": str, "help": "Single command to execute (non-interactive mode)", "default": None}
+)
+
+_DESCRIPTION = "Start the AI Agent system"
+
+def _add_ollama_options(parser):
+    """Add the Ollama specific options"""
+    ollama_group = parser.add_argument_group('Ollama Options')
+    for flag, kwargs in _OLLAMA_OPTIONS:
+        ollama_group.add_argument(flag, **kwargs)
+
+def _add_interactive_option(parser):
+    """Add the --interactive operation mode flag"""
+    flag, kwargs = _INTERACTIVE_OPTION
+    parser.add_argument(flag, **kwargs)
+
+def _build_parser(needs_ollama=True, needs_interactive=True):
+    """
+    Build the argument parser, with or without the optional groups.
     
-    model_group.add_argument(
-        "--model-path",
-        type=str,
-        help="Path to local model weights",
-        default="./local_model_weights"
-    )
+    Args:
+        needs_ollama (bool): Include the Ollama options
+        needs_interactive (bool): Include the --interactive flag
+        
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description=_DESCRIPTION)
     
-    model_group.add_argument(
-        "--ollama",
-        action="store_true",
-        help="Use Ollama for LLM inference"
-    )
+    # Model source options - only one should be used
+    model_group = parser.add_argument_group('Model Source (use only one)')
+    for flag, kwargs in _MODEL_OPTIONS:
+        model_group.add_argument(flag, **kwargs)
     
     # Ollama specific options
-    ollama_group = parser.add_argument_group('Ollama Options')
+    if needs_ollama:
+        _add_ollama_options(parser)
+    else:
+        parser.set_defaults(ollama_url="http://localhost:11434", model_name="llama3")
     
-    ollama_group.add_argument(
-        "--ollama-url",
-        type=str,
-        help="URL of the Ollama server (default: http://localhost:11434)",
-        default="http://localhost:11434"
-    )
+    # Operation mode
+    if needs_interactive:
+        _add_interactive_option(parser)
+    else:
+        parser.set_defaults(interactive=False)
     
-    ollama_group.add_argument(
-        "--model-name",
-        type=str,
-        help="Name of the Ollama model to use (default: llama3)",
-        default="llama3"
-    )
+    flag, kwargs = _COMMAND_OPTION
+    parser.add_argument(flag, **kwargs)
     
-    # Operation mode
-    parser.add_argument(
-        "--interactive",
-        action="store_true",
-        help="Start in interactive mode to accept commands directly"
-    )
+    return parser
+
+class _ParseError(Exception):
+    """Raised instead of exiting when a parser without every option group rejects the arguments"""
+
+def _raise_parse_error(message):
+    """Replacement for ArgumentParser.error that raises _ParseError"""
+    raise _ParseError(message)
+
+def parse_arguments(argv=None):
+    """Parse command line arguments"""
+    if argv is None:
+        argv = sys.argv[1:]
+    needs_ollama, needs_interactive = _sniff_option_groups(argv)
+    if needs_ollama and needs_interactive:
+        return _build_parser().parse_args(argv)
     
-    parser.add_argument(
-        "--command",
-        type=str,
-        help="Single command to execute (non-interactive mode)",
-        default=None
-    )
+    parser = _build_parser(needs_ollama, needs_interactive)
+    parser.error = _raise_parse_error
+    try:
+        return parser.parse_args(argv)
+    except _ParseError:
+        # Report the error with the full parser, so the usage lists every option
+        return _build_parser().parse_args(argv)
+
+def _print_help():
+    """Print the full --help text, without sniffing the command line"""
+    _build_parser().print_help()
+
+def _render_result(result):
+    """
+    Print the result of a processed command.
     
-    return parser.parse_args()
+    Args:
+        result (dict): The response returned by Agent.process_command
+    """
+    # Collect the output and write it in one call
+    match result:
+        case {"status": "success", "result": {"output": output}}:
+            parts = ["\nResult:\n", f"{output}\n"]
+        case {"status": "success", "result": {"stdout": stdout} as action_result}:
+            stderr = action_result.get("stderr")
+            parts = ["\nCommand Output:\n"]
+            if stdout:
+                parts.append(f"{stdout}\n")
+            if stderr:
+                parts.append(f"Errors: {stderr}\n")
+            parts.append(f"Return code: {action_result.get('return_code')}\n")
+        case {"status": "success"}:
+            parts = ["\nCommand executed successfully\n"]
+        case _:
+            parts = [f"\nError: {result.get('error', 'Unknown error')}\n"]
+    sys.stdout.write("".join(parts))
 
 def start_interactive_mode(agent):
     """
@@ -85,19 +195,29 @@ def start_interactive_mode(agent):
         agent (Agent): The initialized Agent instance
     """
     logger.info("Starting interactive mode")
-    print("\nAI Agent Interactive Mode")
-    print("Type 'exit' or 'quit' to end the session")
-    print("------------------------------")
+    sys.stdout.write(_INTERACTIVE_BANNER)
     
     agent.start()
     
+    # Bound once, since they are used for every command
+    write = sys.stdout.write
+    flush = sys.stdout.flush
+    readline = sys.stdin.readline
+    
     while agent.running:
         try:
             # Get command from user
-            command = input("\nEnter command: ")
+            write("\nEnter command: ")
+            flush()
+            command = readline()
             
-            # Check for exit command
-            if command.lower() in ["exit", "quit"]:
+            # Check for end of input or exit command
+            if not command:
+                agent.stop()
+                print("\nEnd of input, exiting interactive mode")
+                break
+            command = command.rstrip("\n")
+            if command.lower() in _EXIT_SET:
                 agent.stop()
                 print("Exiting interactive mode")
                 break
@@ -106,56 +226,52 @@ def start_interactive_mode(agent):
             result = agent.process_command(command)
             
             # Display the result
-            if result["status"] == "success":
-                if "result" in result and "output" in result["result"]:
-                    print("\nResult:")
-                    print(result["result"]["output"])
-                elif "result" in result and "stdout" in result["result"]:
-                    print("\nCommand Output:")
-                    if result["result"]["stdout"]:
-                        print(result["result"]["stdout"])
-                    if result["result"]["stderr"]:
-                        print("Errors:", result["result"]["stderr"])
-                    print(f"Return code: {result['result']['return_code']}")
-                else:
-                    print("\nCommand executed successfully")
-            else:
-                print(f"\nError: {result.get('error', 'Unknown error')}")
+            _render_result(result)
                 
         except KeyboardInterrupt:
             print("\nInterrupted by user")
             agent.stop()
             break
         except Exception as e:
-            logger.error(f"Error in interactive mode: {str(e)}")
+            logger.error("Error in interactive mode: %s", e)
             print(f"\nSystem error: {str(e)}")
 
 def main():
     """Main entry point"""
+    global logger
+    
+    # Plain --help needs only the parser, never the agent stack
+    if len(sys.argv) == 2 and sys.argv[1] in ("-h", "--help"):
+        _print_help()
+        return 0
+    
+    # Parse command line arguments
+    args = parse_arguments()
+    
+    from src.logger import setup_logger
+    logger = setup_logger(__name__)
+    
     try:
-        # Parse command line arguments
-        args = parse_arguments()
+        from src.agent import Agent
         
         # Display startup banner
-        print("\n===================================")
-        print("  AI Agent System")
-        print("===================================\n")
+        sys.stdout.write(_BANNER)
         
         # Determine LLM mode
         if args.ollama:
             # Ollama mode
-            logger.info(f"Using Ollama mode with model: {args.model_name}")
+            logger.info("Using Ollama mode with model: %s", args.model_name)
             agent = Agent(
                 ollama_url=args.ollama_url,
                 model_name=args.model_name
             )
         elif args.api_url:
             # API mode
-            logger.info(f"Using API mode with URL: {args.api_url}")
+            logger.info("Using API mode with URL: %s", args.api_url)
             agent = Agent(api_url=args.api_url)
         else:
             # Direct mode
-            logger.info(f"Using direct mode with model path: {args.model_path}")
+            logger.info("Using direct mode with model path: %s", args.model_path)
             agent = Agent(model_path=args.model_path)
             
         logger.info("Agent initialized successfully")
@@ -163,24 +279,9 @@ def main():
         # Determine operating mode
         if args.command:
             # Single command mode
-            logger.info(f"Executing single command: {args.command}")
+            logger.info("Executing single command: %s", args.command)
             result = agent.process_command(args.command)
-            
-            if result["status"] == "success":
-                if "result" in result and "output" in result["result"]:
-                    print("\nResult:")
-                    print(result["result"]["output"])
-                elif "result" in result and "stdout" in result["result"]:
-                    print("\nCommand Output:")
-                    if result["result"]["stdout"]:
-                        print(result["result"]["stdout"])
-                    if result["result"]["stderr"]:
-                        print("Errors:", result["result"]["stderr"])
-                    print(f"Return code: {result['result']['return_code']}")
-                else:
-                    print("\nCommand executed successfully")
-            else:
-                print(f"\nError: {result.get('error', 'Unknown error')}")
+            _render_result(result)
                 
         elif args.interactive:
             # Interactive mode
@@ -190,7 +291,7 @@ def main():
             start_interactive_mode(agent)
             
     except Exception as e:
-        logger.error(f"Error in main: {str(e)}")
+        logger.error("Error in main: %s", e)
         print(f"Fatal error: {str(e)}")
         return 1
         